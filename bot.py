@@ -4,19 +4,25 @@ A production-ready Telegram bot using aiogram 3 for collecting client orders
 with FSM-based state management and flexible pricing logic.
 """
 
+import asyncio
+import html
+import inspect
+import itertools
 import logging
 import os
-from typing import Dict, Optional
-from dataclasses import dataclass, asdict
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from dataclasses import dataclass, fields
 from enum import Enum
 
-from aiogram import Bot, Dispatcher, F, types
+from aiogram import BaseMiddleware, Bot, Dispatcher, Router, types
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.filters.command import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, Message
-from aiogram.utils.keyboard import InlineKeyboardBuilder
-import asyncio
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, Message, TelegramObject
 
 # Load environment variables if available
 try:
@@ -35,6 +41,9 @@ ADMIN_ID = int(os.getenv("ADMIN_ID", "123456789"))
 LOG_LEVEL_STR = os.getenv("LOG_LEVEL", "INFO")
 LOG_LEVEL = getattr(logging, LOG_LEVEL_STR, logging.INFO)
 
+# Max concurrent Telegram API connections (aiogram's default is 100)
+HTTP_CONNECTION_LIMIT = int(os.getenv("HTTP_CONNECTION_LIMIT", "100"))
+
 
 # ============================================================================
 # LOGGING SETUP
@@ -78,6 +87,20 @@ class ContactMethod(str, Enum):
     PHONE = "phone"
 
 
+# Language code -> member, cheaper than calling the Enum class
+_LANG_BY_VALUE: Dict[str, Language] = {m.value: m for m in Language}
+
+# Callback data prefix lengths; CALLBACK_ROUTES only dispatches matching prefixes
+_LANG_PREFIX_LEN = len("lang_")
+_CONTACT_PREFIX_LEN = len("contact_")
+_SERVICE_PREFIX_LEN = len("service_")
+_PACKAGE_PREFIX_LEN = len("package_")
+
+# Phone numbers: optional "+", then digits with spaces, dashes or parentheses
+_PHONE_RE = re.compile(r"\+?[\d\s\-()]{10,20}$")
+_PHONE_DIGITS_RE = re.compile(r"\D")
+
+
 # ============================================================================
 # TRANSLATIONS
 # ============================================================================
@@ -212,9 +235,15 @@ TRANSLATIONS = {
 }
 
 
-def get_text(lang: Language, key: str) -> str:
+# Per-language tables keyed by the plain language code, which is what the
+# FSM stores; hashing a plain str key is cheaper than a (lang, key) tuple
+_TR: Dict[str, Dict[str, str]] = {lang.value: texts for lang, texts in TRANSLATIONS.items()}
+_TR_FALLBACK = _TR[Language.EN.value]
+
+
+def get_text(lang: str, key: str) -> str:
     """Get translated text"""
-    return TRANSLATIONS.get(lang, TRANSLATIONS[Language.EN]).get(key, key)
+    return _TR.get(lang, _TR_FALLBACK).get(key, key)
 
 
 # ============================================================================
@@ -236,15 +265,18 @@ PRICING = {
     },
 }
 
-# Discount configuration
+# Discount configuration (in percent)
 DISCOUNT_RATES = {
-    (ServiceType.COMBO, WebPackage.PREMIUM): 0.20,
-    (ServiceType.COMBO, WebPackage.START): 0.10,
-    (ServiceType.COMBO, WebPackage.STANDARD): 0.10,
+    (ServiceType.COMBO, WebPackage.PREMIUM): 20,
+    (ServiceType.COMBO, WebPackage.START): 10,
+    (ServiceType.COMBO, WebPackage.STANDARD): 10,
 }
 
 # Queue/Order counter (starts from 1)
-ORDER_QUEUE_COUNTER = 1
+_QUEUE = itertools.count(1)
+
+# Process start time; with the queue number it makes order IDs unique
+_BOOT_TS = int(time.time())
 
 # ============================================================================
 # PROJECT TIMELINE CONFIGURATION
@@ -286,11 +318,70 @@ PROJECT_TIMELINE = {
 }
 
 
+# Column layout of PROJECT_TIMELINE: package -> (step names, step days, delivery days)
+_TL: Dict[WebPackage, Tuple[Tuple[str, ...], Tuple[int, ...], int]] = {
+    web_pkg: (
+        tuple(step_name for step_name, _ in timeline["steps"]),
+        tuple(step_days for _, step_days in timeline["steps"]),
+        timeline["delivery_days"],
+    )
+    for web_pkg, timeline in PROJECT_TIMELINE.items()
+}
+
+
+def _render_timeline(lang: Language, web_pkg: WebPackage) -> str:
+    """Render the project timeline block shown in the order summary"""
+    texts = TRANSLATIONS[lang]
+    step_names, step_days_each, delivery_days = _TL[web_pkg]
+    days = texts["days"]
+    rendered = f"\n\n{texts['timeline']}\n"
+    rendered += f"{texts['delivery']} <b>{delivery_days} {days}</b>\n\n"
+    for step_name, step_days in zip(step_names, step_days_each):
+        rendered += f"• {step_name}: {step_days} {days}\n"
+    return rendered
+
+
+# Timelines never change, so render each (language, package) pair once
+_TIMELINE_RENDERED: Dict[Tuple[str, str], str] = {
+    (lang.value, web_pkg.value): _render_timeline(lang, web_pkg)
+    for lang in Language
+    for web_pkg in PROJECT_TIMELINE
+}
+
+
+def _render_admin_timeline(web_pkg: WebPackage) -> str:
+    """Render the project timeline block sent to the admin"""
+    step_names, step_days_each, delivery_days = _TL[web_pkg]
+    rendered = f"\n📅 <b>Project Timeline:</b> {delivery_days} days\n"
+    for step_name, step_days in zip(step_names, step_days_each):
+        rendered += f"• {step_name}: {step_days} days\n"
+    return rendered
+
+
+# Admin notifications are always in English, so one rendering per package
+_ADMIN_TIMELINE_RENDERED: Dict[WebPackage, str] = {
+    web_pkg: _render_admin_timeline(web_pkg) for web_pkg in PROJECT_TIMELINE
+}
+
+
 # ============================================================================
 # DATA MODELS
 # ============================================================================
 
-@dataclass
+# Display names for fixed option values
+_PKG_CAPITAL: Dict[str, str] = {p.value: p.value.capitalize() for p in WebPackage}
+_CM_CAPITAL: Dict[str, str] = {m.value: m.value.capitalize() for m in ContactMethod}
+
+# Service descriptions keyed by (service_type, web_package) raw values
+_SERVICE_FMT: Dict[Tuple[str, Optional[str]], str] = {}
+for _pkg in WebPackage:
+    _SERVICE_FMT[ServiceType.WEBSITE.value, _pkg.value] = f"Website ({_PKG_CAPITAL[_pkg.value]} package)"
+    _SERVICE_FMT[ServiceType.COMBO.value, _pkg.value] = f"Website ({_PKG_CAPITAL[_pkg.value]}) + Telegram Bot"
+    _SERVICE_FMT[ServiceType.BOT.value, _pkg.value] = "Telegram Bot"
+_SERVICE_FMT[ServiceType.BOT.value, None] = "Telegram Bot"
+
+
+@dataclass(slots=True)
 class OrderData:
     """Data structure for order information"""
     language: str
@@ -306,32 +397,33 @@ class OrderData:
     final_price: int = 0
     queue_number: int = 0  # Navbat raqami
 
-    def to_summary(self) -> str:
-        """Generate a formatted order summary"""
-        summary = (
-            f"📋 <b>Order Summary</b>\n\n"
-            f"👤 <b>Full Name:</b> {self.first_name} {self.last_name}\n"
-            f"🏢 <b>Business Type:</b> {self.business_type}\n"
-            f"📞 <b>Contact:</b> {self.contact}\n"
-            f"📱 <b>Contact Method:</b> {self.contact_method.capitalize()}\n"
-            f"🛠️ <b>Service:</b> {self._format_service()}\n"
-            f"💰 <b>Original Price:</b> {self.original_price:,}\n"
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the order to a plain dict (shallow copy, fields are flat)"""
+        return {name: getattr(self, name) for name in _ORDER_FIELDS}
+
+    def to_summary(self, lang: Optional[str] = None) -> str:
+        """Generate a formatted order summary (in the order's language by default)"""
+        tmpl_no_disc, tmpl_with_disc = _SUMMARY_TEMPLATES.get(
+            lang or self.language, _SUMMARY_TEMPLATES_FALLBACK
         )
-        
         if self.discount_percent > 0:
-            summary += f"🎉 <b>Discount:</b> {self.discount_percent}%\n"
-        
-        summary += f"✅ <b>Final Price:</b> <u>{self.final_price:,}</u>"
-        return summary
+            return tmpl_with_disc.format(
+                self.first_name, self.last_name, self.business_type, self.contact,
+                _CM_CAPITAL[self.contact_method], self._format_service(),
+                self.original_price, self.discount_percent, self.final_price,
+            )
+        return tmpl_no_disc.format(
+            self.first_name, self.last_name, self.business_type, self.contact,
+            _CM_CAPITAL[self.contact_method], self._format_service(),
+            self.original_price, self.final_price,
+        )
 
     def _format_service(self) -> str:
         """Format service description for display"""
-        if self.service_type == ServiceType.WEBSITE:
-            return f"Website ({self.web_package.capitalize()} package)"
-        elif self.service_type == ServiceType.BOT:
-            return "Telegram Bot"
-        else:  # COMBO
-            return f"Website ({self.web_package.capitalize()}) + Telegram Bot"
+        return _SERVICE_FMT[self.service_type, self.web_package]
+
+
+_ORDER_FIELDS = tuple(f.name for f in fields(OrderData))
 
 
 # ============================================================================
@@ -352,135 +444,228 @@ class OrderFormStates(StatesGroup):
     waiting_for_confirmation = State()
 
 
+# ============================================================================
+# FSM STORAGE
+# ============================================================================
+
+class OrderFormStorage(BaseStorage):
+    """In-memory FSM storage that updates order data in place"""
+
+    def __init__(self) -> None:
+        self._states: Dict[StorageKey, Optional[str]] = {}
+        self._data: Dict[StorageKey, Dict[str, Any]] = {}
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state = state.state if isinstance(state, State) else state
+        if state is None:
+            self._states.pop(key, None)
+        else:
+            self._states[key] = state
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return self._states.get(key)
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        if data:
+            self._data[key] = data.copy()
+        else:
+            # Drop finished/cleared forms instead of keeping empty dicts around
+            self._data.pop(key, None)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return self._data.get(key, {}).copy()
+
+    async def update_data(self, key: StorageKey, data: Dict[str, Any]) -> Dict[str, Any]:
+        # Merge into the stored dict directly instead of the default
+        # get_data() + set_data() round-trip, which copies it twice
+        stored = self._data.setdefault(key, {})
+        stored.update(data)
+        return stored.copy()
+
+    async def close(self) -> None:
+        pass
+
+
 # ============================================================================
 # KEYBOARD BUILDERS
 # ============================================================================
 
-def get_language_selection_keyboard() -> InlineKeyboardMarkup:
+def _build_language_selection_keyboard() -> InlineKeyboardMarkup:
     """Build keyboard for language selection"""
-    builder = InlineKeyboardBuilder()
-    builder.add(
-        InlineKeyboardButton(
-            text="🇺🇿 Uzbek",
-            callback_data=f"lang_{Language.UZ.value}"
-        ),
-        InlineKeyboardButton(
-            text="🇬🇧 English",
-            callback_data=f"lang_{Language.EN.value}"
-        ),
-    )
-    builder.add(
-        InlineKeyboardButton(
-            text="🇷🇺 Русский",
-            callback_data=f"lang_{Language.RU.value}"
-        )
-    )
-    builder.adjust(2, 1)
-    return builder.as_markup()
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text="🇺🇿 Uzbek", callback_data=f"lang_{Language.UZ.value}"),
+            InlineKeyboardButton(text="🇬🇧 English", callback_data=f"lang_{Language.EN.value}"),
+        ],
+        [
+            InlineKeyboardButton(text="🇷🇺 Русский", callback_data=f"lang_{Language.RU.value}"),
+        ],
+    ])
+
+
+_WEB_PACKAGE_LABELS = (
+    (WebPackage.START, "start_package"),
+    (WebPackage.STANDARD, "standard_package"),
+    (WebPackage.PREMIUM, "premium_package"),
+)
 
 
-def get_service_selection_keyboard(lang: Language) -> InlineKeyboardMarkup:
+def _build_service_selection_keyboard(lang: Language) -> InlineKeyboardMarkup:
     """Build keyboard for service selection"""
-    builder = InlineKeyboardBuilder()
-    builder.add(
-        InlineKeyboardButton(
-            text=get_text(lang, "website_only"),
-            callback_data=f"service_{ServiceType.WEBSITE.value}"
-        ),
-        InlineKeyboardButton(
-            text=get_text(lang, "bot_only"),
-            callback_data=f"service_{ServiceType.BOT.value}"
-        ),
-    )
-    builder.add(
-        InlineKeyboardButton(
-            text=get_text(lang, "combo"),
-            callback_data=f"service_{ServiceType.COMBO.value}"
-        )
-    )
-    builder.adjust(2, 1)
-    return builder.as_markup()
+    texts = TRANSLATIONS[lang]
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(
+                text=texts["website_only"],
+                callback_data=f"service_{ServiceType.WEBSITE.value}"
+            ),
+            InlineKeyboardButton(
+                text=texts["bot_only"],
+                callback_data=f"service_{ServiceType.BOT.value}"
+            ),
+        ],
+        [
+            InlineKeyboardButton(
+                text=texts["combo"],
+                callback_data=f"service_{ServiceType.COMBO.value}"
+            ),
+        ],
+    ])
 
 
-def get_web_package_keyboard(lang: Language) -> InlineKeyboardMarkup:
+def _build_web_package_keyboard(lang: Language) -> InlineKeyboardMarkup:
     """Build keyboard for web package selection"""
-    builder = InlineKeyboardBuilder()
-    
-    packages = [
-        (WebPackage.START, "start_package"),
-        (WebPackage.STANDARD, "standard_package"),
-        (WebPackage.PREMIUM, "premium_package"),
-    ]
-    
-    for package, label_key in packages:
-        builder.add(
+    texts = TRANSLATIONS[lang]
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
             InlineKeyboardButton(
-                text=get_text(lang, label_key),
+                text=texts[label_key],
                 callback_data=f"package_{package.value}"
             )
-        )
-    
-    return builder.as_markup()
+            for package, label_key in _WEB_PACKAGE_LABELS
+        ],
+    ])
 
 
-def get_contact_method_keyboard(lang: Language) -> InlineKeyboardMarkup:
+def _build_contact_method_keyboard(lang: Language) -> InlineKeyboardMarkup:
     """Build keyboard for contact method selection"""
-    builder = InlineKeyboardBuilder()
-    builder.add(
-        InlineKeyboardButton(
-            text=get_text(lang, "username_label"),
-            callback_data=f"contact_{ContactMethod.USERNAME.value}"
-        ),
-        InlineKeyboardButton(
-            text=get_text(lang, "phone_label"),
-            callback_data=f"contact_{ContactMethod.PHONE.value}"
-        ),
-    )
-    builder.adjust(1)
-    return builder.as_markup()
+    texts = TRANSLATIONS[lang]
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(
+                text=texts["username_label"],
+                callback_data=f"contact_{ContactMethod.USERNAME.value}"
+            ),
+        ],
+        [
+            InlineKeyboardButton(
+                text=texts["phone_label"],
+                callback_data=f"contact_{ContactMethod.PHONE.value}"
+            ),
+        ],
+    ])
 
 
-def get_confirmation_keyboard(lang: Language) -> InlineKeyboardMarkup:
+def _build_confirmation_keyboard(lang: Language) -> InlineKeyboardMarkup:
     """Build keyboard for order confirmation"""
-    builder = InlineKeyboardBuilder()
-    builder.add(
-        InlineKeyboardButton(text=get_text(lang, "confirm"), callback_data="confirm_yes"),
-        InlineKeyboardButton(text=get_text(lang, "cancel"), callback_data="confirm_no"),
+    texts = TRANSLATIONS[lang]
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=texts["confirm"], callback_data="confirm_yes")],
+        [InlineKeyboardButton(text=texts["cancel"], callback_data="confirm_no")],
+    ])
+
+
+# Keyboards only depend on the language, so build every variant once at startup
+_LANG_KB = _build_language_selection_keyboard()
+
+_KEYBOARD_CACHE: Dict[Tuple[str, str], InlineKeyboardMarkup] = {
+    (name, lang.value): build(lang)
+    for name, build in (
+        ("service", _build_service_selection_keyboard),
+        ("web_package", _build_web_package_keyboard),
+        ("contact_method", _build_contact_method_keyboard),
+        ("confirmation", _build_confirmation_keyboard),
     )
-    builder.adjust(1)
-    return builder.as_markup()
+    for lang in Language
+}
+
+
+def get_language_selection_keyboard() -> InlineKeyboardMarkup:
+    """Get keyboard for language selection"""
+    return _LANG_KB
+
+
+def get_service_selection_keyboard(lang: str) -> InlineKeyboardMarkup:
+    """Get keyboard for service selection"""
+    return _KEYBOARD_CACHE["service", lang]
+
+
+def get_web_package_keyboard(lang: str) -> InlineKeyboardMarkup:
+    """Get keyboard for web package selection"""
+    return _KEYBOARD_CACHE["web_package", lang]
+
+
+def get_contact_method_keyboard(lang: str) -> InlineKeyboardMarkup:
+    """Get keyboard for contact method selection"""
+    return _KEYBOARD_CACHE["contact_method", lang]
+
+
+def get_confirmation_keyboard(lang: str) -> InlineKeyboardMarkup:
+    """Get keyboard for order confirmation"""
+    return _KEYBOARD_CACHE["confirmation", lang]
 
 
 # ============================================================================
 # PRICING & CALCULATION LOGIC
 # ============================================================================
 
+def _compute_price(service_type: ServiceType, web_pkg: Optional[WebPackage]) -> Tuple[int, int, int]:
+    """Compute (original, discount percent, final) price for a service/package pair"""
+    if service_type == ServiceType.BOT:
+        original_price = PRICING[ServiceType.BOT]
+    else:
+        original_price = PRICING[service_type][web_pkg]
+    
+    discount_percent = DISCOUNT_RATES.get((service_type, web_pkg), 0)
+    return original_price, discount_percent, original_price - original_price * discount_percent // 100
+
+
+# Every valid (service_type, web_package) pair keyed by raw values, as stored in FSM data.
+# The bot price ignores the package, so it is registered under every package too.
+_FINAL_PRICE_TABLE: Dict[Tuple[str, Optional[str]], Tuple[int, int, int]] = {
+    (service_type.value, web_pkg.value): _compute_price(service_type, web_pkg)
+    for service_type in (ServiceType.WEBSITE, ServiceType.COMBO)
+    for web_pkg in WebPackage
+}
+for _pkg in (None, *(p.value for p in WebPackage)):
+    _FINAL_PRICE_TABLE[ServiceType.BOT.value, _pkg] = _compute_price(ServiceType.BOT, None)
+
+
 def calculate_order_price(order: OrderData) -> None:
     """Calculate original, discount, and final price for the order"""
-    
-    # Convert string to enum if needed
-    service_type = ServiceType(order.service_type) if isinstance(order.service_type, str) else order.service_type
-    
-    if service_type == ServiceType.WEBSITE:
-        web_pkg = WebPackage(order.web_package) if isinstance(order.web_package, str) else order.web_package
-        order.original_price = PRICING[ServiceType.WEBSITE][web_pkg]
-        order.discount_percent = 0
-    
-    elif service_type == ServiceType.BOT:
-        order.original_price = PRICING[ServiceType.BOT]
-        order.discount_percent = 0
-    
-    elif service_type == ServiceType.COMBO:
-        web_pkg = WebPackage(order.web_package) if isinstance(order.web_package, str) else order.web_package
-        order.original_price = PRICING[ServiceType.COMBO][web_pkg]
-        
-        # Apply discount based on package
-        discount_key = (ServiceType.COMBO, web_pkg)
-        order.discount_percent = int(DISCOUNT_RATES.get(discount_key, 0) * 100)
-    
-    # Calculate final price
-    discount_amount = order.original_price * (order.discount_percent / 100)
-    order.final_price = int(order.original_price - discount_amount)
+    order.original_price, order.discount_percent, order.final_price = (
+        _FINAL_PRICE_TABLE[order.service_type, order.web_package]
+    )
+
+
+# ============================================================================
+# MIDDLEWARES
+# ============================================================================
+
+class LanguageMiddleware(BaseMiddleware):
+    """Read FSM data once per update and inject it with the selected language"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        state: Optional[FSMContext] = data.get("state")
+        form_data = await state.get_data() if state is not None else {}
+        data["form_data"] = form_data
+        data["lang"] = form_data.get("language", Language.EN.value)
+        return await handler(event, data)
 
 
 # ============================================================================
@@ -512,79 +697,69 @@ async def process_language(
 ) -> None:
     """Process language selection"""
     try:
-        lang_str = callback.data.split("_")[1]
+        lang_str = callback.data[_LANG_PREFIX_LEN:]
         # lang_str will be like "uz", "en", "ru"
-        lang_enum = Language(lang_str)
+        lang_enum = _LANG_BY_VALUE[lang_str]
         
-        await state.update_data(language=lang_enum)
+        await state.update_data(language=lang_enum.value)
         await callback.answer()
         
         # DON'T use ReplyKeyboardRemove with edit_text! Just pass None
         await callback.message.edit_text(
-            get_text(lang_enum, "welcome")
+            get_text(lang_enum.value, "welcome")
         )
         await state.set_state(OrderFormStates.waiting_for_first_name)
-        logger.info(f"Language selected: {lang_enum}")
+        logger.info("Language selected: %s", lang_enum)
     
     except Exception as e:
-        logger.error(f"Language selection error: {e}")
+        logger.error("Language selection error: %s", e)
         await callback.answer("❌ Xatolik! /start qayta bosing.", show_alert=True)
 
 
-async def process_first_name(message: Message, state: FSMContext) -> None:
-    """Process first name input"""
-    data = await state.get_data()
-    lang = data.get("language", Language.EN)
-    
-    if not message.text or len(message.text) < 2:
-        await message.answer(get_text(lang, "error_name"))
-        return
-    
-    await state.update_data(first_name=message.text)
-    await message.answer(get_text(lang, "first_name"))
-    await state.set_state(OrderFormStates.waiting_for_last_name)
+def make_text_handler(
+    field: str,
+    next_state: State,
+    min_len: int,
+    prompt_key: str,
+    keyboard: Optional[Callable[[str], InlineKeyboardMarkup]] = None,
+) -> Callable[[Message, FSMContext, str], Awaitable[None]]:
+    """Build a handler that validates a text field, stores it and asks the next question"""
 
+    async def process_text_field(message: Message, state: FSMContext, lang: str) -> None:
+        if not message.text or len(message.text) < min_len:
+            await message.answer(get_text(lang, "error_name"))
+            return
+        
+        # Escaped once here since summaries are sent with parse_mode="HTML"
+        await state.update_data(**{field: html.escape(message.text)})
+        await message.answer(
+            get_text(lang, prompt_key),
+            reply_markup=keyboard(lang) if keyboard is not None else None,
+        )
+        await state.set_state(next_state)
 
-async def process_last_name(message: Message, state: FSMContext) -> None:
-    """Process last name input"""
-    data = await state.get_data()
-    lang = data.get("language", Language.EN)
-    
-    if not message.text or len(message.text) < 2:
-        await message.answer(get_text(lang, "error_name"))
-        return
-    
-    await state.update_data(last_name=message.text)
-    await message.answer(get_text(lang, "last_name"))
-    await state.set_state(OrderFormStates.waiting_for_business_type)
+    return process_text_field
 
 
-async def process_business_type(message: Message, state: FSMContext) -> None:
-    """Process business type input"""
-    data = await state.get_data()
-    lang = data.get("language", Language.EN)
-    
-    if not message.text or len(message.text) < 3:
-        await message.answer(get_text(lang, "error_name"))
-        return
-    
-    await state.update_data(business_type=message.text)
-    await message.answer(
-        get_text(lang, "contact_method"),
-        reply_markup=get_contact_method_keyboard(lang),
-    )
-    await state.set_state(OrderFormStates.waiting_for_contact_method)
+process_first_name = make_text_handler(
+    "first_name", OrderFormStates.waiting_for_last_name, 2, "first_name",
+)
+process_last_name = make_text_handler(
+    "last_name", OrderFormStates.waiting_for_business_type, 2, "last_name",
+)
+process_business_type = make_text_handler(
+    "business_type", OrderFormStates.waiting_for_contact_method, 3, "contact_method",
+    keyboard=get_contact_method_keyboard,
+)
 
 
 async def process_contact_method(
     callback: types.CallbackQuery,
     state: FSMContext,
+    lang: str,
 ) -> None:
     """Process contact method selection"""
-    data = await state.get_data()
-    lang = data.get("language", Language.EN)
-    
-    method = callback.data.split("_")[1]
+    method = callback.data[_CONTACT_PREFIX_LEN:]
     await state.update_data(contact_method=method)
     
     prompt_key = "enter_username" if method == ContactMethod.USERNAME.value else "enter_phone"
@@ -594,22 +769,29 @@ async def process_contact_method(
     await state.set_state(OrderFormStates.waiting_for_contact)
 
 
-async def process_contact(message: Message, state: FSMContext) -> None:
+async def process_contact(
+    message: Message,
+    state: FSMContext,
+    lang: str,
+    form_data: Dict[str, Any],
+) -> None:
     """Process contact information input"""
-    data = await state.get_data()
-    lang = data.get("language", Language.EN)
-    contact_method = data.get("contact_method")
+    contact_method = form_data.get("contact_method")
     
     if contact_method == ContactMethod.USERNAME.value:
         if not message.text or len(message.text) < 3:
             await message.answer(get_text(lang, "error_contact"))
             return
-        contact = f"@{message.text.lstrip('@')}"
+        contact = f"@{html.escape(message.text.lstrip('@'))}"
     else:  # PHONE
-        if not message.text or len(message.text.replace("+", "").replace(" ", "")) < 10:
+        if (
+            not message.text
+            or not _PHONE_RE.match(message.text)
+            or len(_PHONE_DIGITS_RE.sub("", message.text)) < 10
+        ):
             await message.answer(get_text(lang, "error_contact"))
             return
-        contact = message.text
+        contact = html.escape(message.text)
     
     await state.update_data(contact=contact)
     await message.answer(
@@ -622,12 +804,10 @@ async def process_contact(message: Message, state: FSMContext) -> None:
 async def process_service_selection(
     callback: types.CallbackQuery,
     state: FSMContext,
+    lang: str,
 ) -> None:
     """Process service type selection"""
-    data = await state.get_data()
-    lang = data.get("language", Language.EN)
-    
-    service = callback.data.split("_")[1]
+    service = callback.data[_SERVICE_PREFIX_LEN:]
     await state.update_data(service_type=service)
     
     await callback.answer()
@@ -656,7 +836,7 @@ async def process_web_package(
     state: FSMContext,
 ) -> None:
     """Process web package selection"""
-    package = callback.data.split("_")[1]
+    package = callback.data[_PACKAGE_PREFIX_LEN:]
     await state.update_data(web_package=package)
     await callback.answer()
     
@@ -665,10 +845,8 @@ async def process_web_package(
 
 async def show_order_summary(message: Message, state: FSMContext) -> None:
     """Display order summary and ask for confirmation"""
-    global ORDER_QUEUE_COUNTER
-    
     data = await state.get_data()
-    lang = data.get("language", Language.EN)
+    lang = data.get("language", Language.EN.value)
     
     # Create order object
     order = OrderData(
@@ -680,17 +858,14 @@ async def show_order_summary(message: Message, state: FSMContext) -> None:
         contact_method=data["contact_method"],
         service_type=data["service_type"],
         web_package=data.get("web_package"),
-        queue_number=ORDER_QUEUE_COUNTER,  # Assign queue number
+        queue_number=next(_QUEUE),  # Assign queue number
     )
     
-    # Increment for next order
-    ORDER_QUEUE_COUNTER += 1
-    
     # Calculate pricing
     calculate_order_price(order)
     
     # Store order in state for later use
-    await state.update_data(order_data=asdict(order))
+    await state.update_data(order_data=order.to_dict())
     
     # Generate summary
     summary = _generate_summary(order, lang)
@@ -705,95 +880,98 @@ async def show_order_summary(message: Message, state: FSMContext) -> None:
     await state.set_state(OrderFormStates.waiting_for_confirmation)
 
 
-def _generate_summary(order: OrderData, lang: Language) -> str:
-    """Generate order summary in the specified language"""
-    service_desc = _format_service(order)
-    
-    summary = (
-        f"📋 <b>{get_text(lang, 'summary')}</b>\n\n"
-        f"{get_text(lang, 'full_name')} {order.first_name} {order.last_name}\n"
-        f"{get_text(lang, 'business')} {order.business_type}\n"
-        f"{get_text(lang, 'contact')} {order.contact}\n"
-        f"{get_text(lang, 'contact_method_label')} {order.contact_method.capitalize()}\n"
-        f"{get_text(lang, 'service')} {service_desc}\n"
-        f"{get_text(lang, 'original_price')} {order.original_price:,}\n"
+def _build_summary_templates(lang: Language) -> Tuple[str, str]:
+    """Build (without discount, with discount) summary templates for a language"""
+    texts = TRANSLATIONS[lang]
+    head = (
+        f"📋 <b>{texts['summary']}</b>\n\n"
+        f"{texts['full_name']} {{}} {{}}\n"
+        f"{texts['business']} {{}}\n"
+        f"{texts['contact']} {{}}\n"
+        f"{texts['contact_method_label']} {{}}\n"
+        f"{texts['service']} {{}}\n"
+        f"{texts['original_price']} {{:,}}\n"
     )
-    
-    if order.discount_percent > 0:
-        summary += f"{get_text(lang, 'discount')} {order.discount_percent}%\n"
-    
-    summary += f"{get_text(lang, 'final_price')} <u>{order.final_price:,}</u>\n"
+    tail = f"{texts['final_price']} <u>{{:,}}</u>\n"
+    return head + tail, head + f"{texts['discount']} {{}}%\n" + tail
+
+
+# Summary labels are resolved once per language instead of on every order
+_SUMMARY_TEMPLATES: Dict[str, Tuple[str, str]] = {
+    lang.value: _build_summary_templates(lang) for lang in Language
+}
+_SUMMARY_TEMPLATES_FALLBACK = _SUMMARY_TEMPLATES[Language.EN.value]
+
+
+def _generate_summary(order: OrderData, lang: str) -> str:
+    """Generate order summary in the specified language"""
+    summary = order.to_summary(lang)
     
     # Add timeline if web package is selected
     if order.web_package:
-        try:
-            web_pkg = WebPackage(order.web_package) if isinstance(order.web_package, str) else order.web_package
-            timeline = PROJECT_TIMELINE.get(web_pkg)
-            if timeline:
-                summary += f"\n\n{get_text(lang, 'timeline')}\n"
-                summary += f"{get_text(lang, 'delivery')} <b>{timeline['delivery_days']} {get_text(lang, 'days')}</b>\n\n"
-                for step_name, step_days in timeline['steps']:
-                    summary += f"• {step_name}: {step_days} {get_text(lang, 'days')}\n"
-        except Exception as e:
-            logger.warning(f"Could not add timeline: {e}")
+        timeline = _TIMELINE_RENDERED.get((lang, order.web_package))
+        if timeline:
+            summary += timeline
+        else:
+            logger.warning("Could not add timeline: %s", order.web_package)
     
     return summary
 
 
-def _format_service(order: OrderData) -> str:
-    """Format service description for display"""
-    if order.service_type == ServiceType.WEBSITE.value:
-        return f"Website ({order.web_package.capitalize()} package)"
-    elif order.service_type == ServiceType.BOT.value:
-        return "Telegram Bot"
-    else:  # COMBO
-        return f"Website ({order.web_package.capitalize()}) + Telegram Bot"
+QUEUE_TEMPLATES: Dict[str, str] = {
+    Language.UZ.value: (
+        "\n\n📋 <b>Navbat Raqami:</b> #{queue_num}\n"
+        "⏳ <b>Kutish Vaqti:</b> 3 hafta\n"
+        "📞 <b>Aloqa:</b> 1-2 kun ichida siz bilan bog'lanamiz"
+    ),
+    Language.RU.value: (
+        "\n\n📋 <b>Номер очереди:</b> #{queue_num}\n"
+        "⏳ <b>Время ожидания:</b> 3 недели\n"
+        "📞 <b>Контакт:</b> Мы свяжемся с вами в течение 1-2 дней"
+    ),
+    Language.EN.value: (
+        "\n\n📋 <b>Queue Number:</b> #{queue_num}\n"
+        "⏳ <b>Waiting Time:</b> 3 weeks\n"
+        "📞 <b>Contact:</b> We'll reach out in 1-2 days"
+    ),
+}
 
 
 async def process_confirmation(
     callback: types.CallbackQuery,
     state: FSMContext,
+    lang: str,
+    form_data: Dict[str, Any],
 ) -> None:
     """Process order confirmation"""
-    data = await state.get_data()
-    lang = data.get("language", Language.EN)
-    
     if callback.data == "confirm_yes":
         await callback.answer("✅ Order confirmed!", show_alert=False)
         
-        order_data = data.get("order_data")
+        order_data = form_data.get("order_data")
         queue_num = order_data.get("queue_number", 1)
         
         # Build confirmation message with queue info
-        confirmation_msg = get_text(lang, "order_confirmed") + generate_order_id()
+        confirmation_msg = get_text(lang, "order_confirmed") + generate_order_id(queue_num)
         
-        if lang == Language.UZ:
-            queue_text = (
-                f"\n\n📋 <b>Navbat Raqami:</b> #{queue_num}\n"
-                f"⏳ <b>Kutish Vaqti:</b> 3 hafta\n"
-                f"📞 <b>Aloqa:</b> 1-2 kun ichida siz bilan bog'lanamiz"
-            )
-        elif lang == Language.RU:
-            queue_text = (
-                f"\n\n📋 <b>Номер очереди:</b> #{queue_num}\n"
-                f"⏳ <b>Время ожидания:</b> 3 недели\n"
-                f"📞 <b>Контакт:</b> Мы свяжемся с вами в течение 1-2 дней"
-            )
-        else:  # English
-            queue_text = (
-                f"\n\n📋 <b>Queue Number:</b> #{queue_num}\n"
-                f"⏳ <b>Waiting Time:</b> 3 weeks\n"
-                f"📞 <b>Contact:</b> We'll reach out in 1-2 days"
-            )
+        queue_text = QUEUE_TEMPLATES.get(lang, QUEUE_TEMPLATES[Language.EN.value]).format(queue_num=queue_num)
         
-        # Send confirmation to user
-        await callback.message.edit_text(
-            confirmation_msg + queue_text,
-            parse_mode="HTML",
+        # Send confirmation to user and order to admin concurrently.
+        # gather() hashes its arguments and the EditMessageText returned by
+        # edit_text() is unhashable, so the edit is executed through the bot.
+        user_result, _ = await asyncio.gather(
+            callback.bot(
+                callback.message.edit_text(
+                    confirmation_msg + queue_text,
+                    parse_mode="HTML",
+                )
+            ),
+            send_order_to_admin(callback.bot, order_data),
+            return_exceptions=True,
         )
-        
-        # Send to admin with queue info
-        await send_order_to_admin(callback.bot, order_data)
+        # The admin already has the order at this point, so the form must be
+        # cleared even if the user-side edit failed, or a retry resends it
+        if isinstance(user_result, Exception):
+            logger.error("Failed to send order confirmation to user: %s", user_result)
         
         await state.clear()
     
@@ -805,14 +983,55 @@ async def process_confirmation(
         await state.clear()
 
 
+# (handler, wants lang, wants form_data)
+CallbackRoute = Tuple[Callable[..., Awaitable[None]], bool, bool]
+
+
+def _callback_route(handler: Callable[..., Awaitable[None]]) -> CallbackRoute:
+    """Pair a callback handler with which injected values it accepts"""
+    params = inspect.signature(handler).parameters
+    return handler, "lang" in params, "form_data" in params
+
+
+# Callback handlers keyed by (FSM state, callback data prefix)
+CALLBACK_ROUTES: Dict[Tuple[Optional[str], str], CallbackRoute] = {
+    (OrderFormStates.waiting_for_language.state, "lang"): _callback_route(process_language),
+    (OrderFormStates.waiting_for_contact_method.state, "contact"): _callback_route(process_contact_method),
+    (OrderFormStates.waiting_for_service_selection.state, "service"): _callback_route(process_service_selection),
+    (OrderFormStates.waiting_for_web_package.state, "package"): _callback_route(process_web_package),
+    (OrderFormStates.waiting_for_confirmation.state, "confirm"): _callback_route(process_confirmation),
+}
+
+
+async def on_callback(
+    callback: types.CallbackQuery,
+    state: FSMContext,
+    raw_state: Optional[str],
+    lang: str,
+    form_data: Dict[str, Any],
+) -> None:
+    """Dispatch a callback query to its handler with one table lookup"""
+    route = CALLBACK_ROUTES.get((raw_state, (callback.data or "").partition("_")[0]))
+    if route is None:
+        # Stale button from an earlier step or a finished form
+        return
+    handler, wants_lang, wants_form_data = route
+    # Like aiogram itself, only pass the injected values a handler asks for
+    kwargs: Dict[str, Any] = {}
+    if wants_lang:
+        kwargs["lang"] = lang
+    if wants_form_data:
+        kwargs["form_data"] = form_data
+    await handler(callback, state, **kwargs)
+
+
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
-def generate_order_id() -> str:
+def generate_order_id(queue_num: int) -> str:
     """Generate a simple order ID"""
-    import time
-    return f"ORD-{int(time.time())}"
+    return f"ORD-{_BOOT_TS}-{queue_num}"
 
 
 async def send_order_to_admin(bot: Bot, order_data: Dict) -> None:
@@ -820,42 +1039,38 @@ async def send_order_to_admin(bot: Bot, order_data: Dict) -> None:
     try:
         queue_num = order_data.get("queue_number", 1)
         
-        message_text = (
+        parts = [
             f"📋 <b>New Order Received</b>\n"
             f"📍 <b>Queue #:</b> {queue_num}\n\n"
             f"👤 <b>Name:</b> {order_data['first_name']} {order_data['last_name']}\n"
             f"🏢 <b>Business:</b> {order_data['business_type']}\n"
             f"📞 <b>Contact:</b> {order_data['contact']}\n"
-            f"📱 <b>Method:</b> {order_data['contact_method'].capitalize()}\n"
+            f"📱 <b>Method:</b> {_CM_CAPITAL[order_data['contact_method']]}\n"
             f"🛠️ <b>Service:</b> {_format_admin_service(order_data)}\n"
             f"💰 <b>Original Price:</b> {order_data['original_price']:,}\n"
             f"🎉 <b>Discount:</b> {order_data['discount_percent']}%\n"
             f"✅ <b>Final Price:</b> {order_data['final_price']:,}\n"
-        )
+        ]
         
         # Add timeline if web package exists
         if order_data.get('web_package'):
-            try:
-                web_pkg = WebPackage(order_data['web_package']) if isinstance(order_data['web_package'], str) else order_data['web_package']
-                timeline = PROJECT_TIMELINE.get(web_pkg)
-                if timeline:
-                    message_text += f"\n📅 <b>Project Timeline:</b> {timeline['delivery_days']} days\n"
-                    for step_name, step_days in timeline['steps']:
-                        message_text += f"• {step_name}: {step_days} days\n"
-            except Exception as e:
-                logger.warning(f"Could not add timeline to admin message: {e}")
+            timeline = _ADMIN_TIMELINE_RENDERED.get(order_data['web_package'])
+            if timeline:
+                parts.append(timeline)
+            else:
+                logger.warning("Could not add timeline to admin message: %s", order_data['web_package'])
         
-        message_text += f"\n⏳ <b>Action:</b> Contact client in 1-2 days"
+        parts.append("\n⏳ <b>Action:</b> Contact client in 1-2 days")
         
         await bot.send_message(
             chat_id=ADMIN_ID,
-            text=message_text,
+            text="".join(parts),
             parse_mode="HTML",
         )
-        logger.info(f"Order #{queue_num} sent to admin: {order_data}")
+        logger.info("Order #%s sent to admin: %s", queue_num, order_data)
     
     except Exception as e:
-        logger.error(f"Failed to send order to admin: {e}")
+        logger.error("Failed to send order to admin: %s", e)
 
 
 def _format_admin_service(order_data: Dict) -> str:
@@ -863,70 +1078,64 @@ def _format_admin_service(order_data: Dict) -> str:
     service = order_data["service_type"]
     
     if service == ServiceType.WEBSITE.value:
-        return f"Website ({order_data['web_package'].capitalize()})"
+        return f"Website ({_PKG_CAPITAL[order_data['web_package']]})"
     elif service == ServiceType.BOT.value:
         return "Telegram Bot"
     else:
-        return f"Website ({order_data['web_package'].capitalize()}) + Bot"
+        return f"Website ({_PKG_CAPITAL[order_data['web_package']]}) + Bot"
 
 
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
 
-async def main() -> None:
-    """Main function to start the bot"""
-    
-    # Initialize bot and dispatcher
-    bot = Bot(token=BOT_TOKEN)
-    dp = Dispatcher()
-    
-    # Register handlers
-    dp.message.register(cmd_start, Command("start"))
-    dp.message.register(cmd_cancel, Command("cancel"))
+def _build_router() -> Router:
+    """Register all handlers on a router"""
+    router = Router()
+    router.message.register(cmd_start, Command("start"))
+    router.message.register(cmd_cancel, Command("cancel"))
     
     # FSM handlers
-    dp.callback_query.register(
-        process_language,
-        OrderFormStates.waiting_for_language,
-        F.data.startswith("lang_"),
-    )
-    dp.message.register(
+    router.message.register(
         process_first_name,
         OrderFormStates.waiting_for_first_name,
     )
-    dp.message.register(
+    router.message.register(
         process_last_name,
         OrderFormStates.waiting_for_last_name,
     )
-    dp.message.register(
+    router.message.register(
         process_business_type,
         OrderFormStates.waiting_for_business_type,
     )
-    dp.callback_query.register(
-        process_contact_method,
-        OrderFormStates.waiting_for_contact_method,
-        F.data.startswith("contact_"),
-    )
-    dp.message.register(
+    router.message.register(
         process_contact,
         OrderFormStates.waiting_for_contact,
     )
-    dp.callback_query.register(
-        process_service_selection,
-        OrderFormStates.waiting_for_service_selection,
-        F.data.startswith("service_"),
-    )
-    dp.callback_query.register(
-        process_web_package,
-        OrderFormStates.waiting_for_web_package,
-        F.data.startswith("package_"),
-    )
-    dp.callback_query.register(
-        process_confirmation,
-        OrderFormStates.waiting_for_confirmation,
-        F.data.startswith("confirm_"),
-    )
+    
+    # All inline buttons go through one handler, see CALLBACK_ROUTES
+    router.callback_query.register(on_callback)
+    
+    return router
+
+
+# Handlers are registered once at import; main() only attaches the router
+ROUTER = _build_router()
+
+
+async def main() -> None:
+    """Main function to start the bot"""
+    
+    # Initialize bot and dispatcher
+    bot = Bot(token=BOT_TOKEN, session=AiohttpSession(limit=HTTP_CONNECTION_LIMIT))
+    dp = Dispatcher(storage=OrderFormStorage())
+    
+    # Inject the selected language into every handler
+    dp.message.middleware(LanguageMiddleware())
+    dp.callback_query.middleware(LanguageMiddleware())
+    
+    # Attach the prebuilt handlers
+    dp.include_router(ROUTER)
     
     # Start polling
     logger.info("🤖 Bot started successfully")
@@ -935,7 +1144,7 @@ async def main() -> None:
         await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
     
     except Exception as e:
-        logger.error(f"❌ Fatal error: {e}")
+        logger.error("❌ Fatal error: %s", e)
     
     finally:
         await bot.session.close()